@@ -1,97 +1,355 @@
-from flask import Flask, render_template, request, url_for
+from flask import Flask, redirect, render_template, request, url_for
 import pytesseract
 from PIL import Image
 import os
 import re
 import string
+import pickle
 import sqlite3
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+import fitz  # PyMuPDF
 import nltk
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from functools import wraps
+from itertools import filterfalse, repeat
 from nltk.corpus import stopwords
 from werkzeug.utils import secure_filename   # ✅ Added import
 
+# Tesseract runs ~4 OpenMP threads per call; pin it to one so that page-level
+# parallelism in the OCR pool doesn't oversubscribe the CPU. libgomp reads this
+# when libtesseract is loaded, so it must be set before tesserocr is imported.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# tesserocr needs the libtesseract headers to build; fall back to the CLI when missing
+try:
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
 # ---------- Flask Config ----------
 app = Flask(__name__)
 UPLOAD_FOLDER = "uploads"
 DB_NAME = "documents.db"
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+UPLOAD_BUFFER_SIZE = 1024 * 1024  # copy uploads to disk in 1 MiB chunks
+
+# ---------- OCR Worker Pool ----------
+# Each gunicorn worker gets its own pool, so split the cores between them
+OCR_WORKERS = max(1, (os.cpu_count() or 1) // int(os.environ.get("WEB_CONCURRENCY", 1)))
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def get_ocr_pool():
+    # Created lazily so each server worker builds its own pool after forking;
+    # "spawn" keeps the children free of the parent's threads and locks.
+    global _ocr_pool
+    with _ocr_pool_lock:
+        # A worker that died (e.g. killed for memory) leaves the pool unusable; start over
+        if _ocr_pool is not None and getattr(_ocr_pool, "_broken", False):
+            _ocr_pool.shutdown(wait=False)
+            _ocr_pool = None
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _ocr_pool
+
+def ocr_task(func):
+    """Mark a function run in the OCR pool.
+
+    Worker exceptions are pickled back to the parent, and some (pytesseract's
+    TesseractNotFoundError) can't be rebuilt there, which breaks the whole
+    pool. Re-raise them as a plain RuntimeError instead.
+    """
+    @wraps(func)
+    def task(*args):
+        try:
+            return func(*args)
+        except Exception as e:
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return task
+
+# ---------- OCR Helpers ----------
+# One preloaded Tesseract handle per process; the API itself is not thread-safe
+_tess_api = None
+_tess_lock = threading.Lock()
+
+def ocr_image(image):
+    """OCR a PIL image or image path, reusing this process's Tesseract handle when tesserocr is installed."""
+    global _tess_api
+    if PyTessBaseAPI is None:
+        return pytesseract.image_to_string(image)
+    with _tess_lock:
+        if _tess_api is None:
+            _tess_api = PyTessBaseAPI(lang="eng")
+        if isinstance(image, str):
+            _tess_api.SetImageFile(image)
+        else:
+            _tess_api.SetImage(image)
+        return _tess_api.GetUTF8Text()
+
+@ocr_task
+def extract_text_from_image(filepath):
+    """OCR an uploaded image file (submitted to the OCR pool by the routes)."""
+    # Pass the path so Tesseract's Leptonica decodes the file once, with no
+    # PIL decode and temp-PNG re-encode in between
+    return fix_ocr_text(ocr_image(filepath))
+
+# Common Tesseract misreads, fixed in one C-level regex pass over the OCR output:
+# letter O inside numbers, l/I between digits, and words hyphenated across lines
+_OCR_FIXES = re.compile(r"(?<=[A-Z])O(?=\d)|(?<=\d)O|(?<=\d)[lI](?=\d)|(?<=\w)-\n(?=\w)")
+_OCR_REPLACEMENTS = {"O": "0", "l": "1", "I": "1", "-\n": ""}
+
+def fix_ocr_text(text):
+    return _OCR_FIXES.sub(lambda m: _OCR_REPLACEMENTS[m.group()], text)
+
+OCR_UNAVAILABLE = "⚠️ OCR not available in hosted version."
+
+# Tesseract is tuned for ~300 DPI; grayscale keeps each page at one byte per pixel
+OCR_DPI = 300
+
+# Long image lists can deadlock Tesseract's output pipe, so cap each batch
+OCR_BATCH_SIZE = 50
+
+def render_page(page):
+    """Rasterize a PDF page in-process to a grayscale PIL image at OCR resolution."""
+    pix = page.get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+@ocr_task
+def ocr_pdf_pages(filepath, page_numbers):
+    """OCR a run of PDF pages, loading the Tesseract model only once for the batch."""
+    with fitz.open(filepath) as doc:
+        if PyTessBaseAPI is not None:
+            # The preloaded handle already avoids the per-page model load
+            return "\n".join(ocr_image(render_page(doc[n])) for n in page_numbers)
+
+        # Otherwise hand Tesseract an image-list file so one CLI run covers every page
+        with tempfile.TemporaryDirectory() as tmpdir:
+            image_paths = []
+            for n in page_numbers:
+                path = os.path.join(tmpdir, f"page_{n:04d}.png")
+                doc[n].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY).save(path)
+                image_paths.append(path)
+            list_path = os.path.join(tmpdir, "pages.txt")
+            with open(list_path, "w") as f:
+                f.write("\n".join(image_paths) + "\n")
+            return pytesseract.image_to_string(list_path)
+
+def batch_pages(page_numbers):
+    # Spread the pages over the pool, but never more than OCR_BATCH_SIZE per run
+    size = max(1, min(OCR_BATCH_SIZE, -(-len(page_numbers) // OCR_WORKERS)))
+    return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
 
 # ---------- NLTK Stopwords Setup ----------
-# Try to load stopwords; download only if missing
-try:
-    stop_words = set(stopwords.words("english"))
-except LookupError:
-    nltk.download("stopwords")
-    stop_words = set(stopwords.words("english"))
+# Pickled frozenset lets cold starts skip NLTK's corpus reader entirely
+STOPWORDS_CACHE = "stopwords.pkl"
+
+def load_stop_words():
+    try:
+        with open(STOPWORDS_CACHE, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    # Try to load stopwords; download only if missing
+    try:
+        words = frozenset(stopwords.words("english"))
+    except LookupError:
+        nltk.download("stopwords")
+        words = frozenset(stopwords.words("english"))
+
+    # Write-then-rename so concurrently starting workers never read a partial file
+    tmp_path = f"{STOPWORDS_CACHE}.{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(words, f)
+        os.replace(tmp_path, STOPWORDS_CACHE)
+    except OSError:
+        pass  # the cache is only an optimisation
+    return words
+
+stop_words = load_stop_words()
 
 # ---------- Database Setup ----------
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
+# One connection per process, shared by request threads; hold _db_lock while using it
+_db_conn = None
+_db_lock = threading.Lock()
+
+def init_db(conn):
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS documents (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             filename TEXT,
             extracted_text TEXT,
-            category TEXT
+            category TEXT,
+            filehash TEXT
         )
     ''')
+    # Databases created before content hashing lack the filehash column
+    columns = {row[1] for row in c.execute("PRAGMA table_info(documents)")}
+    if "filehash" not in columns:
+        c.execute("ALTER TABLE documents ADD COLUMN filehash TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_category ON documents(category)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_filehash ON documents(filehash)")
     conn.commit()
-    conn.close()
+
+def get_db():
+    """Return this process's SQLite connection, opening it on first use (caller holds _db_lock)."""
+    global _db_conn
+    if _db_conn is None:
+        conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+        # WAL lets readers run alongside a writer; NORMAL skips the fsync on every commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        init_db(conn)
+        _db_conn = conn
+    return _db_conn
+
+DASHBOARD_PAGE_SIZE = 50
+
+# Bootstrap badge colour for each category
+CATEGORY_COLORS = {
+    "Bill": "primary",
+    "ID Document": "warning",
+    "Notes": "success",
+    "Certificate": "info",
+    "Uncategorized": "secondary"
+}
 
 # ---------- Text Preprocessing ----------
+# Lowercase and strip digits/punctuation in a single str.translate pass
+_PREPROCESS_TABLE = str.maketrans(
+    {**dict.fromkeys(string.digits + string.punctuation),
+     **{c: c.lower() for c in string.ascii_uppercase}}
+)
+
 def preprocess_text(text):
-    text = text.lower()
-    text = re.sub(r'\d+', '', text)  # remove numbers
-    text = text.translate(str.maketrans('', '', string.punctuation))  # remove punctuation
+    text = text.translate(_PREPROCESS_TABLE)
     tokens = text.split()
-    tokens = [w for w in tokens if w not in stop_words]
-    return " ".join(tokens)
+    return " ".join(filterfalse(stop_words.__contains__, tokens))  # drop stopwords
 
 # ---------- Rule-Based Categorizer ----------
+# Categories in priority order (first match wins)
+CATEGORY_KEYWORDS = [
+    ("Bill", ["invoice", "gst", "amount", "total"]),
+    ("ID Document", ["prn", "roll", "student", "id"]),
+    ("Notes", ["assignment", "lecture", "subject", "class"]),
+    ("Certificate", ["certificate", "award", "completion"]),
+]
+
+# One pattern with a group per category; the lookahead reports overlapping hits
+# so a single scan sees every keyword, just like the old per-keyword substring checks
+_CATEGORY_PATTERN = re.compile(
+    "(?=" + "|".join(
+        "(" + "|".join(map(re.escape, words)) + ")" for _, words in CATEGORY_KEYWORDS
+    ) + ")"
+)
+
 def categorize(text):
-    if any(word in text for word in ["invoice", "gst", "amount", "total"]):
-        return "Bill"
-    elif any(word in text for word in ["prn", "roll", "student", "id"]):
-        return "ID Document"
-    elif any(word in text for word in ["assignment", "lecture", "subject", "class"]):
-        return "Notes"
-    elif any(word in text for word in ["certificate", "award", "completion"]):
-        return "Certificate"
-    else:
-        return "Uncategorized"
+    best = len(CATEGORY_KEYWORDS)
+    for match in _CATEGORY_PATTERN.finditer(text):
+        best = min(best, match.lastindex - 1)
+        if best == 0:
+            break
+    if best < len(CATEGORY_KEYWORDS):
+        return CATEGORY_KEYWORDS[best][0]
+    return "Uncategorized"
+
+# LRU of raw-text digest -> category, so repeat content skips preprocessing;
+# keyed by digest rather than the text itself to avoid pinning large OCR dumps
+CLASSIFY_CACHE_SIZE = 1024
+_classify_cache = OrderedDict()
+_classify_lock = threading.Lock()
+
+def classify_text(text):
+    """Preprocess and categorize raw extracted text, memoizing the result."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _classify_lock:
+        if key in _classify_cache:
+            _classify_cache.move_to_end(key)
+            return _classify_cache[key]
+
+    category = categorize(preprocess_text(text))
+
+    with _classify_lock:
+        _classify_cache[key] = category
+        if len(_classify_cache) > CLASSIFY_CACHE_SIZE:
+            _classify_cache.popitem(last=False)
+    return category
 
 # ---------- PDF/Text Extraction ----------
 def extract_text_from_pdf(filepath):
     """
     Try to extract text from a PDF:
-    1. Direct text extraction with PyPDF2
-    2. If empty, fallback to OCR with pdf2image + Tesseract
+    1. Direct text extraction with PyMuPDF
+    2. If empty, fallback to OCR: pool workers rasterize batches of pages with
+       PyMuPDF and run them through Tesseract in parallel
     """
-    text = ""
+    parts = []
 
     try:
         # Step 1: Try direct extraction (text-based PDFs)
-        reader = PdfReader(filepath)
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
+        with fitz.open(filepath) as doc:
+            parts = [page.get_text() for page in doc]
+            page_count = doc.page_count
 
         # Step 2: If no text found, fallback to OCR (scanned PDFs)
-        if not text.strip():
+        if not any(part.strip() for part in parts):
+            parts = []
             try:
-                pages = convert_from_path(filepath)
-                for page in pages:
-                    text += pytesseract.image_to_string(page)
+                batches = batch_pages(range(page_count))
+                texts = get_ocr_pool().map(ocr_pdf_pages, repeat(filepath), batches)
+                parts.extend(map(fix_ocr_text, texts))
             except Exception:
-                text += "\n⚠️ OCR not available in hosted version."
+                parts.append(OCR_UNAVAILABLE)
 
     except Exception as e:
         return f"❌ Error extracting PDF: {e}"
 
-    return text.strip()
+    # Joined once at the end; += on a str copies the whole buffer per page
+    return "\n".join(parts).strip()
+
+def hash_file(filepath):
+    """SHA-256 of a file's contents (hashlib uses the CPU's SHA extensions where available)."""
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+def process_upload(filepath):
+    """
+    Extract and categorize a saved upload.
+    Returns (text, category, filehash); filehash is None if extraction failed.
+    """
+    # Identical content was already processed: reuse it instead of re-running OCR
+    filehash = hash_file(filepath)
+    with _db_lock:
+        cached = get_db().execute(
+            "SELECT extracted_text, category FROM documents WHERE filehash=? LIMIT 1",
+            (filehash,)
+        ).fetchone()
+    if cached:
+        return cached[0], cached[1], filehash
+
+    # PDF or Image detection
+    if filepath.lower().endswith(".pdf"):
+        text = extract_text_from_pdf(filepath)
+    else:
+        # Run OCR in the pool so this request thread only waits on it
+        text = get_ocr_pool().submit(extract_text_from_image, filepath).result()
+
+    # Preprocess + Categorize
+    category = classify_text(text)
+
+    # A failed extraction must not stand in for later uploads of this file
+    if text.startswith("❌") or text.endswith(OCR_UNAVAILABLE):
+        filehash = None
+    return text, category, filehash
 
 # ---------- Routes ----------
 @app.route('/')
@@ -113,274 +371,127 @@ def upload_file():
     filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
 
     try:
-        file.save(filepath)
-
-        # PDF or Image detection
-        if filename.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(filepath)
-        else:
-            text = pytesseract.image_to_string(Image.open(filepath))
+        file.save(filepath, buffer_size=UPLOAD_BUFFER_SIZE)
 
-        # Preprocess + Categorize
-        clean_text = preprocess_text(text)
-        category = categorize(clean_text)
+        text, category, filehash = process_upload(filepath)
 
         # Save to DB
-        conn = sqlite3.connect(DB_NAME)
-        c = conn.cursor()
-        c.execute(
-            "INSERT INTO documents (filename, extracted_text, category) VALUES (?, ?, ?)",
-            (filename, text, category)
-        )
-        conn.commit()
-        conn.close()
+        with _db_lock:
+            conn = get_db()
+            conn.execute(
+                "INSERT INTO documents (filename, extracted_text, category, filehash) VALUES (?, ?, ?, ?)",
+                (filename, text, category, filehash)
+            )
+            conn.commit()
 
     except Exception as e:
         return f"❌ Error processing file: {e}"
 
-    return f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Extraction Result</title>
-
-    <!-- Bootstrap -->
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
-
-    <style>
-        body {{
-            background-color: #f8f9fa;
-            font-family: 'Segoe UI', sans-serif;
-            padding: 30px;
-        }}
-        .result-card {{
-            background: #fff;
-            border-radius: 15px;
-            box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-            padding: 30px;
-            max-width: 900px;
-            margin: auto;
-        }}
-        pre {{
-            background: #f1f3f5;
-            border-radius: 10px;
-            padding: 20px;
-            max-height: 500px;
-            overflow-y: auto;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        }}
-        h2 {{
-            color: #007bff;
-            font-weight: 600;
-        }}
-        h3 {{
-            color: #343a40;
-            margin-top: 20px;
-        }}
-        .btn {{
-            border-radius: 10px;
-            margin-top: 20px;
-        }}
-    </style>
-</head>
-<body>
-
-    <div class="result-card">
-        <h2>📄 Extracted Text</h2>
-        <pre>{text}</pre>
-
-        <h3>🧠 Predicted Category:</h3>
-        <p><span class="badge bg-primary fs-6">{category}</span></p>
-
-        <div class="mt-4">
-            <a href='{url_for('dashboard')}' class="btn btn-outline-secondary">📂 Go to Dashboard</a>
-            <a href='/' class="btn btn-primary">⬅️ Upload Another</a>
-        </div>
-    </div>
-
-</body>
-</html>
-"""
+    return render_template("result.html", text=text, category=category)
+
+
+def process_batch_file(filepath):
+    # One bad file shouldn't discard the rest of the batch; store its error as its row
+    try:
+        return process_upload(filepath)
+    except Exception as e:
+        return f"❌ Error processing file: {e}", "Uncategorized", None
+
+
+@app.route('/upload_batch', methods=['POST'])
+def upload_batch():
+    uploads = []
+    disk_names = set()
+    for file in request.files.getlist('files'):
+        filename = secure_filename(file.filename)
+        if not filename:
+            continue
+        # Files sharing a name in one batch would overwrite each other on disk
+        # before being processed, so give repeats a numbered name
+        disk_name = filename
+        stem, ext = os.path.splitext(filename)
+        n = 1
+        while disk_name in disk_names:
+            disk_name = f"{stem}_{n}{ext}"
+            n += 1
+        disk_names.add(disk_name)
+        uploads.append((filename, os.path.join(app.config['UPLOAD_FOLDER'], disk_name), file))
+
+    if not uploads:
+        return "❌ No files uploaded"
+
+    try:
+        for _, filepath, file in uploads:
+            file.save(filepath, buffer_size=UPLOAD_BUFFER_SIZE)
+
+        # Threads only wait on the OCR pool, so every file's pages get queued at once
+        with ThreadPoolExecutor(max_workers=OCR_WORKERS) as threads:
+            results = list(threads.map(process_batch_file, [filepath for _, filepath, _ in uploads]))
+
+        # Save to DB in a single transaction
+        with _db_lock:
+            conn = get_db()
+            conn.executemany(
+                "INSERT INTO documents (filename, extracted_text, category, filehash) VALUES (?, ?, ?, ?)",
+                [(filename, *result) for (filename, _, _), result in zip(uploads, results)]
+            )
+            conn.commit()
+
+    except Exception as e:
+        return f"❌ Error processing files: {e}"
+
+    return redirect(url_for('dashboard'))
 
 
 @app.route('/dashboard')
 def dashboard():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, filename, category FROM documents")
-    docs = c.fetchall()
-    conn.close()
-
-    # Generate table rows dynamically
-    rows_html = ""
-    color_map = {
-        "Bill": "primary",
-        "ID Document": "warning",
-        "Notes": "success",
-        "Certificate": "info",
-        "Uncategorized": "secondary"
-    }
-
-    for doc in docs:
-        color = color_map.get(doc[2], "secondary")
-        rows_html += f"""
-        <tr>
-            <td>{doc[0]}</td>
-            <td>{doc[1]}</td>
-            <td><span class='badge bg-{color}'>{doc[2]}</span></td>
-            <td><a href='/view/{doc[0]}' class='btn btn-sm btn-outline-primary'>View</a></td>
-        </tr>
-        """
-
-    return f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Document Dashboard</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
-        <style>
-            body {{
-                background-color: #f8f9fa;
-                font-family: 'Segoe UI', sans-serif;
-                padding: 40px;
-            }}
-            .dashboard-card {{
-                background: #fff;
-                border-radius: 15px;
-                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                max-width: 1000px;
-                margin: auto;
-            }}
-            table {{
-                border-radius: 10px;
-                overflow: hidden;
-            }}
-            th {{
-                background-color: #007bff;
-                color: white;
-            }}
-            .btn {{
-                border-radius: 8px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="dashboard-card">
-            <h2 class="text-center text-primary mb-4">📂 Document Dashboard</h2>
-
-            <table class="table table-striped table-hover">
-                <thead>
-                    <tr>
-                        <th>ID</th>
-                        <th>File Name</th>
-                        <th>Category</th>
-                        <th>Action</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {rows_html if docs else "<tr><td colspan='4' class='text-center text-muted'>No documents uploaded yet.</td></tr>"}
-                </tbody>
-            </table>
-
-            <div class="text-center mt-4">
-                <a href="/" class="btn btn-primary">⬆️ Upload More</a>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    # Keyset pagination: newest first, ?before=<id> continues after the last row shown
+    before = request.args.get("before", type=int)
+    query = "SELECT id, filename, category FROM documents"
+    params = ()
+    if before is not None:
+        query += " WHERE id < ?"
+        params = (before,)
+    query += " ORDER BY id DESC LIMIT ?"
+
+    with _db_lock:
+        docs = get_db().execute(query, params + (DASHBOARD_PAGE_SIZE,)).fetchall()
+
+    next_before = docs[-1][0] if len(docs) == DASHBOARD_PAGE_SIZE else None
+    return render_template(
+        "dashboard.html",
+        docs=docs,
+        before=before,
+        next_before=next_before,
+        colors=CATEGORY_COLORS
+    )
 
 
 @app.route('/view/<int:doc_id>')
 def view_doc(doc_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT filename, extracted_text, category FROM documents WHERE id=?", (doc_id,))
-    doc = c.fetchone()
-    conn.close()
+    with _db_lock:
+        doc = get_db().execute(
+            "SELECT filename, extracted_text, category FROM documents WHERE id=?", (doc_id,)
+        ).fetchone()
 
     if not doc:
         return "<h3 class='text-danger text-center mt-5'>❌ Document not found</h3>"
 
     filename, extracted_text, category = doc
-
-    color_map = {
-        "Bill": "primary",
-        "ID Document": "warning",
-        "Notes": "success",
-        "Certificate": "info",
-        "Uncategorized": "secondary"
-    }
-    badge_color = color_map.get(category, "secondary")
-
-    return f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>View Document - {filename}</title>
-
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
-
-        <style>
-            body {{
-                background-color: #f8f9fa;
-                font-family: 'Segoe UI', sans-serif;
-                padding: 40px;
-            }}
-            .viewer-card {{
-                background: #fff;
-                border-radius: 15px;
-                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-                padding: 30px;
-                max-width: 1000px;
-                margin: auto;
-            }}
-            pre {{
-                background: #f1f3f5;
-                border-radius: 10px;
-                padding: 20px;
-                max-height: 600px;
-                overflow-y: auto;
-                white-space: pre-wrap;
-                word-wrap: break-word;
-            }}
-            .btn {{
-                border-radius: 10px;
-            }}
-        </style>
-    </head>
-    <body>
-
-        <div class="viewer-card">
-            <h2 class="text-primary">📄 {filename}</h2>
-            <p><span class="badge bg-{badge_color} fs-6">{category}</span></p>
-
-            <h5 class="mt-4 mb-2 text-secondary">Extracted Text:</h5>
-            <pre>{extracted_text}</pre>
-
-            <div class="text-center mt-4">
-                <a href='{url_for('dashboard')}' class="btn btn-outline-secondary">⬅️ Back to Dashboard</a>
-                <a href='/' class="btn btn-primary">📤 Upload New Document</a>
-            </div>
-        </div>
-
-    </body>
-    </html>
-    """
+    return render_template(
+        "view.html",
+        filename=filename,
+        extracted_text=extracted_text,
+        category=category,
+        color=CATEGORY_COLORS.get(category, "secondary")
+    )
 
 
 # ---------- Main ----------
 if __name__ == "__main__":
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    init_db()
+    with _db_lock:
+        get_db()  # opens the connection and creates the schema
     # ✅ Use Render’s port if available; else default to 5000 for local runs
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
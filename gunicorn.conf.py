@@ -0,0 +1,14 @@
+# Gunicorn settings, picked up automatically from the working directory
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# OCR runs in a process pool inside each worker, so only a few web workers are
+# needed; app.py divides the cores between their pools using WEB_CONCURRENCY
+workers = int(os.environ.get("WEB_CONCURRENCY", max(1, multiprocessing.cpu_count() // 4)))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Threads let a worker keep serving the dashboard while its uploads wait on OCR
+worker_class = "gthread"
+threads = 4